@@ -171,6 +171,7 @@ from .perpeventqueue import UnseenPerpEventChangesTracker as UnseenPerpEventChan
 from .perpmarket import PerpMarket as PerpMarket
 from .perpmarket import PerpMarketStub as PerpMarketStub
 from .perpmarketdetails import PerpMarketDetails as PerpMarketDetails
+from .perpmarketdetails import PerpScaler as PerpScaler
 from .perpmarketoperations import PerpMarketInstructionBuilder as PerpMarketInstructionBuilder
 from .perpmarketoperations import PerpMarketOperations as PerpMarketOperations
 from .perpopenorders import PerpOpenOrders as PerpOpenOrders
@@ -225,8 +225,11 @@ else:
 # found out how to do that. So as a quick workaround, we return the three keys in their own
 # dictionary.
 #
+# The order ID is only ever used as an ID (never in any arithmetic) so it's returned as a plain
+# `int`, the same as `Order.id`, rather than as a `Decimal`.
+#
 if typing.TYPE_CHECKING:
-    class BookPriceAdapter(construct.Adapter[typing.Dict[str, Decimal], bytes, typing.Any, typing.Any]):
+    class BookPriceAdapter(construct.Adapter[typing.Dict[str, typing.Union[int, Decimal]], bytes, typing.Any, typing.Any]):
         def __init__(self) -> None:
             pass
 else:
@@ -234,8 +237,8 @@ else:
         def __init__(self) -> None:
             super().__init__(construct.Bytes(16))
 
-        def _decode(self, obj: bytes, context: typing.Any, path: typing.Any) -> typing.Dict[str, Decimal]:
-            order_id = Decimal(int.from_bytes(obj, 'little', signed=False))
+        def _decode(self, obj: bytes, context: typing.Any, path: typing.Any) -> typing.Dict[str, typing.Union[int, Decimal]]:
+            order_id = int.from_bytes(obj, 'little', signed=False)
             low_order = obj[:8]
             high_order = obj[8:]
             sequence_number = Decimal(int.from_bytes(low_order, 'little', signed=False))
@@ -247,7 +250,7 @@ else:
                 "sequence_number": sequence_number
             }
 
-        def _encode(self, obj: typing.Dict[str, Decimal], context: typing.Any, path: typing.Any) -> bytes:
+        def _encode(self, obj: typing.Dict[str, typing.Union[int, Decimal]], context: typing.Any, path: typing.Any) -> bytes:
             # Not done yet
             raise NotImplementedError()
 
@@ -260,6 +263,13 @@ else:
 # didn't work - complaining about the use of sizeof(), even though all NODE layouts are exactly 72 bytes.
 _NODE_SIZE = 88
 
+# The `tag` values that say which type of node an `AnyNode` is.
+UNINITIALIZED_NODE_TAG: int = 0
+INNER_NODE_TAG: int = 1
+LEAF_NODE_TAG: int = 2
+FREE_NODE_TAG: int = 3
+LAST_FREE_NODE_TAG: int = 4
+
 
 if typing.TYPE_CHECKING:
     class OrderBookNodeAdapter(construct.Adapter[typing.Any, typing.Any, typing.Any, typing.Any]):
@@ -271,19 +281,14 @@ else:
             super().__init__(construct.Bytes(_NODE_SIZE))
 
         def _decode(self, obj: bytes, context: typing.Any, path: typing.Any) -> typing.Any:
-            any_node = ANY_NODE.parse(obj)
-            if any_node.tag == Decimal(0):
-                return UNINITIALIZED_BOOK_NODE.parse(obj)
-            elif any_node.tag == Decimal(1):
-                return INNER_BOOK_NODE.parse(obj)
-            elif any_node.tag == Decimal(2):
-                return LEAF_BOOK_NODE.parse(obj)
-            elif any_node.tag == Decimal(3):
-                return FREE_BOOK_NODE.parse(obj)
-            elif any_node.tag == Decimal(4):
-                return LAST_FREE_BOOK_NODE.parse(obj)
-
-            raise Exception(f"Unknown node type tag: {any_node.tag}")
+            # The tag is the first u32 - read it directly as an `int` rather than parsing the whole
+            # node as an ANY_NODE just to get a `Decimal` tag to compare.
+            tag = int.from_bytes(obj[:4], "little", signed=False)
+            node_layout = _BOOK_NODE_LAYOUTS_BY_TAG.get(tag)
+            if node_layout is None:
+                raise Exception(f"Unknown node type tag: {tag}")
+
+            return node_layout.parse(obj)
 
         def _encode(self, obj: typing.Any, context: typing.Any, path: typing.Any) -> typing.Any:
             # Not done yet
@@ -929,6 +934,14 @@ LAST_FREE_BOOK_NODE = construct.Struct(
 )
 assert LAST_FREE_BOOK_NODE.sizeof() == ANY_NODE.sizeof()
 
+_BOOK_NODE_LAYOUTS_BY_TAG: typing.Dict[int, typing.Any] = {
+    UNINITIALIZED_NODE_TAG: UNINITIALIZED_BOOK_NODE,
+    INNER_NODE_TAG: INNER_BOOK_NODE,
+    LEAF_NODE_TAG: LEAF_BOOK_NODE,
+    FREE_NODE_TAG: FREE_BOOK_NODE,
+    LAST_FREE_NODE_TAG: LAST_FREE_BOOK_NODE
+}
+
 
 # # 🥭 ORDERBOOK_SIDE
 #
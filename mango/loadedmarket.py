@@ -21,7 +21,7 @@ from .accountinfo import AccountInfo
 from .context import Context
 from .lotsizeconverter import LotSizeConverter
 from .market import Market, InventorySource
-from .orders import Order, OrderBook
+from .orders import Order, OrderBook, Side
 from .token import Instrument, Token
 
 
@@ -44,6 +44,15 @@ class LoadedMarket(Market):
     def parse_account_info_to_orders(self, account_info: AccountInfo) -> typing.Sequence[Order]:
         raise NotImplementedError("LoadedMarket.parse_account_info_to_orders() is not implemented on the base type.")
 
+    # Returns just the best `count` orders from the account, best first. Derived classes can override
+    # this if they can find the best orders without parsing them all.
+    def parse_account_info_to_top_orders(self, account_info: AccountInfo, count: int) -> typing.Sequence[Order]:
+        orders: typing.List[Order] = list(self.parse_account_info_to_orders(account_info))
+        # Sort the same way OrderBook does, so the best bid or ask is at index 0.
+        is_bids: bool = len(orders) > 0 and orders[0].side == Side.BUY
+        orders.sort(key=lambda order: order.id, reverse=is_bids)
+        return orders[:count]
+
     def parse_account_infos_to_orderbook(self, bids_account_info: AccountInfo, asks_account_info: AccountInfo) -> OrderBook:
         bids_orderbook = self.parse_account_info_to_orders(bids_account_info)
         asks_orderbook = self.parse_account_info_to_orders(asks_account_info)
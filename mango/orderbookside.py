@@ -14,6 +14,9 @@
 #   [Email](mailto:hello@blockworks.foundation)
 
 import enum
+import numpy
+import struct
+import sys
 import typing
 
 from decimal import Decimal
@@ -25,7 +28,7 @@ from .context import Context
 from .layouts import layouts
 from .metadata import Metadata
 from .orders import Order, OrderType, Side
-from .perpmarketdetails import PerpMarketDetails
+from .perpmarketdetails import PerpMarketDetails, PerpScaler
 from .version import Version
 
 
@@ -45,6 +48,44 @@ class OrderBookSideType(enum.Enum):
         return f"{self}"
 
 
+# # 🥭 Raw orderbook side structures
+#
+# Parsing the full `layouts.ORDERBOOK_SIDE` with `construct` builds Python objects for all
+# `MAX_BOOK_NODES` nodes on every update, even though only the nodes actually in the tree are
+# ever looked at. Instead the header is read with `struct` and the node array is mapped (without
+# copying) onto a numpy structured array, so each field can be read as a column across all nodes.
+# (See `layouts.py` for the Rust structures.)
+#
+# `construct` works out `sizeof()` by walking the whole layout each time, so it's only done once.
+_ORDERBOOK_SIDE_SIZE = layouts.ORDERBOOK_SIDE.sizeof()
+
+# `meta_data` (8 bytes) is followed by:
+#   bump_index: usize, free_list_len: usize, free_list_head: u32, root_node: u32, leaf_count: usize
+_HEADER = struct.Struct("<QQIIQ")
+_HEADER_OFFSET = layouts.METADATA.sizeof()
+_NODES_OFFSET = _HEADER_OFFSET + _HEADER.size
+_NODE_SIZE = layouts.ANY_NODE.sizeof()
+
+# Inner and leaf nodes share the same 88 bytes, so their fields overlap:
+#   inner: tag: u32, prefix_len: u32, key: i128, children: [u32; 2]
+#   leaf:  tag: u32, owner_slot: u8, padding: [u8; 3], key: i128 (sequence number, price),
+#          owner: Pubkey, quantity: i64, client_order_id: u64
+_NODE_DTYPE = numpy.dtype({
+    "names": ["tag", "children", "sequence_number", "price", "owner", "quantity", "client_order_id"],
+    "formats": ["<u4", ("<u4", 2), "<u8", "<u8", "V32", "<i8", "<u8"],
+    "offsets": [0, 24, 8, 16, 24, 56, 64],
+    "itemsize": _NODE_SIZE
+})
+
+# The same nodes, read as u32 words: each node is `_NODE_WORDS` words long, and an inner node's
+# two children are the words starting at byte 24.
+_NODE_WORDS = _NODE_SIZE // 4
+_CHILDREN_WORD = 24 // 4
+
+_INNER_TAG = layouts.INNER_NODE_TAG
+_LEAF_TAG = layouts.LEAF_NODE_TAG
+
+
 # # 🥭 PerpOrderBookSide class
 #
 # `PerpOrderBookSide` holds orders for one side of a market.
@@ -66,27 +107,32 @@ class PerpOrderBookSide(AddressableAccount):
         self.leaf_count: Decimal = leaf_count
         self.nodes: typing.Any = nodes
 
-    @staticmethod
-    def from_layout(layout: typing.Any, account_info: AccountInfo, version: Version, perp_market_details: PerpMarketDetails) -> "PerpOrderBookSide":
-        meta_data = Metadata.from_layout(layout.meta_data)
-        bump_index: Decimal = layout.bump_index
-        free_list_len: Decimal = layout.free_list_len
-        free_list_head: Decimal = layout.free_list_head
-        root_node: Decimal = layout.root_node
-        leaf_count: Decimal = layout.leaf_count
-        nodes: typing.Any = layout.nodes
+        # `data_type` is a `construct` enum string, so it's only compared once.
+        self._is_bids: bool = meta_data.data_type == layouts.DATA_TYPE.Bids
+        self._order_side: Side = Side.BUY if self._is_bids else Side.SELL
+
+        # Scratch stack for walking the tree, reused when the same side is walked again (say by
+        # repeated `top_n()` calls). Every update parses a new side, so instances aren't shared
+        # between threads.
+        self._stack: typing.List[int] = []
 
-        return PerpOrderBookSide(account_info, version, meta_data, perp_market_details, bump_index, free_list_len, free_list_head, root_node, leaf_count, nodes)
+        # The last string built by `__str__()`, along with the state it was built from.
+        self._str_cache: typing.Optional[typing.Tuple[typing.Tuple[PublicKey, Decimal, Decimal], str]] = None
 
     @staticmethod
     def parse(account_info: AccountInfo, perp_market_details: PerpMarketDetails) -> "PerpOrderBookSide":
         data = account_info.data
-        if len(data) != layouts.ORDERBOOK_SIDE.sizeof():
+        if len(data) != _ORDERBOOK_SIDE_SIZE:
             raise Exception(
-                f"PerpOrderBookSide data length ({len(data)}) does not match expected size ({layouts.ORDERBOOK_SIDE.sizeof()})")
+                f"PerpOrderBookSide data length ({len(data)}) does not match expected size ({_ORDERBOOK_SIDE_SIZE})")
 
-        layout = layouts.ORDERBOOK_SIDE.parse(data)
-        return PerpOrderBookSide.from_layout(layout, account_info, Version.V1, perp_market_details)
+        meta_data = Metadata.from_layout(layouts.METADATA.parse(data))
+        bump_index, free_list_len, free_list_head, root_node, leaf_count = _HEADER.unpack_from(data, _HEADER_OFFSET)
+        nodes = numpy.frombuffer(data, dtype=_NODE_DTYPE, offset=_NODES_OFFSET, count=layouts.MAX_BOOK_NODES)
+
+        return PerpOrderBookSide(account_info, Version.V1, meta_data, perp_market_details, Decimal(bump_index),
+                                 Decimal(free_list_len), Decimal(free_list_head), Decimal(root_node),
+                                 Decimal(leaf_count), nodes)
 
     @staticmethod
     def load(context: Context, address: PublicKey, perp_market_details: PerpMarketDetails) -> "PerpOrderBookSide":
@@ -95,49 +141,162 @@ class PerpOrderBookSide(AddressableAccount):
             raise Exception(f"PerpOrderBookSide account not found at address '{address}'")
         return PerpOrderBookSide.parse(account_info, perp_market_details)
 
-    def orders(self) -> typing.Sequence[Order]:
-        if self.leaf_count == 0:
+    # Returns the raw leaf data, best price first, without any conversion from lots. Each leaf is
+    # returned as a tuple of plain `int`s (and the owner):
+    #   (order ID, client order ID, owner, price in lots, quantity in lots)
+    #
+    # Without a `limit` the whole side is wanted, so the leaf nodes are just sorted by key (see
+    # `_sorted_leaf_indices()`), only falling back to walking the tree if the data looks wrong. With
+    # a `limit` the tree is walked depth-first - it's a crit-bit tree, so that finds the leaves in
+    # price order - and the walk stops as soon as it has found that many leaves, so only the path
+    # down to the best leaves gets visited.
+    #
+    # This is kept separate from `orders()` so that finding the leaves is as tight as it can be -
+    # all the `Decimal` scaling happens afterwards, and only for the orders that are actually
+    # needed.
+    def _leaves(self, limit: typing.Optional[int] = None) -> typing.List[typing.Tuple[int, int, PublicKey, int, int]]:
+        # Pull out just the leaves, a column at a time.
+        leaves = self.nodes[self._leaf_indices(limit)]
+        return [((price << 64) | sequence_number, client_order_id, PublicKey(owner), price, quantity)
+                for sequence_number, price, owner, quantity, client_order_id
+                in zip(leaves["sequence_number"].tolist(), leaves["price"].tolist(), leaves["owner"].tolist(),
+                       leaves["quantity"].tolist(), leaves["client_order_id"].tolist())]
+
+    # Returns the indices of the leaf nodes, in the order described for `_leaves()` above.
+    def _leaf_indices(self, limit: typing.Optional[int] = None) -> typing.List[int]:
+        if self.leaf_count == 0 or (limit is not None and limit <= 0):
             return []
 
-        if self.meta_data.data_type == layouts.DATA_TYPE.Bids:
-            order_side = Side.BUY
-        else:
-            order_side = Side.SELL
-
-        stack = [self.root_node]
-        orders: typing.List[Order] = []
-        while len(stack) > 0:
-            index = int(stack.pop())
-            node = self.nodes[index]
-            if node.type_name == "leaf":
-                price = node.key["price"]
-                quantity = node.quantity
-
-                decimals_differential = self.perp_market_details.base_instrument.decimals - \
-                    self.perp_market_details.quote_token.token.decimals
-                native_to_ui = Decimal(10) ** decimals_differential
-                quote_lot_size = self.perp_market_details.quote_lot_size
-                base_lot_size = self.perp_market_details.base_lot_size
-                actual_price = price * (quote_lot_size / base_lot_size) * native_to_ui
-
-                base_factor = Decimal(10) ** self.perp_market_details.base_instrument.decimals
-                actual_quantity = (quantity * self.perp_market_details.base_lot_size) / base_factor
-
-                orders += [Order(int(node.key["order_id"]),
-                                 node.client_order_id,
-                                 node.owner,
-                                 order_side,
-                                 actual_price,
-                                 actual_quantity,
-                                 OrderType.UNKNOWN)]
-            elif node.type_name == "inner":
-                if order_side == Side.BUY:
-                    stack = [*stack, node.children[0], node.children[1]]
+        if limit is None:
+            sorted_leaf_indices = self._sorted_leaf_indices()
+            if sorted_leaf_indices is not None:
+                return sorted_leaf_indices
+
+        # Only the tags and children are needed to walk the tree, and they're both u32s. Reading
+        # them through a flat view of the nodes' u32 words gives plain `int`s straight from the
+        # buffer, instead of building numpy scalars (and arrays, for the children) at every node.
+        words = self._node_words()
+        is_bids = self._is_bids
+        leaf_indices: typing.List[int] = []
+        append = leaf_indices.append
+
+        # A limited walk can stop with nodes still on the stack, so clear it before using it again.
+        stack = self._stack
+        stack.clear()
+        push = stack.append
+        pop = stack.pop
+        push(int(self.root_node))
+        while stack:
+            index = pop()
+            word = index * _NODE_WORDS
+            tag = words[word]
+            if tag == _LEAF_TAG:
+                append(index)
+                if len(leaf_indices) == limit:
+                    break
+            elif tag == _INNER_TAG:
+                lower = words[word + _CHILDREN_WORD]
+                upper = words[word + _CHILDREN_WORD + 1]
+                # Push the far child first so the near child is popped (and visited) next.
+                if is_bids:
+                    push(lower)
+                    push(upper)
                 else:
-                    stack = [*stack, node.children[1], node.children[0]]
-        return orders
+                    push(upper)
+                    push(lower)
+
+        return leaf_indices
 
+    # Returns the nodes as one flat sequence of u32 words, `_NODE_WORDS` per node. On a
+    # little-endian machine this is just a view of the account data - nothing is copied.
+    def _node_words(self) -> typing.Sequence[int]:
+        words = self.nodes.view("<u4")
+        if sys.byteorder != "little":
+            words = words.astype("=u4")
+        return memoryview(words)
+
+    # Returns the indices of all the leaf nodes, in the order described for `_leaves()` above,
+    # without walking the tree at all.
+    #
+    # Removed nodes are retagged as free nodes, so every node tagged as a leaf is in the tree. And
+    # since it's a crit-bit tree, visiting its leaves in order is the same as sorting them by key -
+    # which numpy can do for the whole side in one go, far quicker than stepping through the nodes
+    # one at a time in Python.
+    #
+    # If the number of leaves found doesn't match the header's `leaf_count` the data isn't what
+    # we expect, so this returns `None` and the tree gets walked instead.
+    def _sorted_leaf_indices(self) -> typing.Optional[typing.List[int]]:
+        nodes = self.nodes
+        indices = numpy.flatnonzero(nodes["tag"] == _LEAF_TAG)
+        if len(indices) != self.leaf_count:
+            return None
+
+        # The key is (price, sequence number), so sort by price and then by sequence number.
+        by_key = indices[numpy.lexsort((nodes["sequence_number"][indices], nodes["price"][indices]))]
+        if self._is_bids:
+            by_key = by_key[::-1]
+
+        leaf_indices: typing.List[int] = by_key.tolist()
+        return leaf_indices
+
+    @staticmethod
+    def _order_from_lots(leaf: typing.Tuple[int, int, PublicKey, int, int], side: Side, scaler: PerpScaler) -> Order:
+        order_id, client_order_id, owner, price_lots, quantity_lots = leaf
+        return Order(order_id, client_order_id, owner, side, scaler.price(price_lots),
+                     scaler.quantity(quantity_lots), OrderType.UNKNOWN)
+
+    def _to_orders(self, leaves: typing.Sequence[typing.Tuple[int, int, PublicKey, int, int]]) -> typing.List[Order]:
+        order_side = self._order_side
+        scaler = self.perp_market_details.scaler
+        return [PerpOrderBookSide._order_from_lots(leaf, order_side, scaler) for leaf in leaves]
+
+    # Returns all the orders, best first, as a `list`. Callers use the whole book anyway so it's
+    # built in one go rather than being yielded order-by-order.
+    def orders(self) -> typing.List[Order]:
+        return self._to_orders(self._leaves())
+
+    # Yields the orders one at a time, best first, for callers that may stop early. The tree is
+    # still walked in one go but each order is only converted from lots when it's reached.
+    def _orders_iter(self) -> typing.Iterator[Order]:
+        order_side = self._order_side
+        scaler = self.perp_market_details.scaler
+        for leaf in self._leaves():
+            yield PerpOrderBookSide._order_from_lots(leaf, order_side, scaler)
+
+    # Returns just the best `count` orders - the highest bids or the lowest asks - best first,
+    # without walking (or converting) the rest of the book.
+    def top_n(self, count: int) -> typing.List[Order]:
+        return self._to_orders(self._leaves(count))
+
+    # Returns the single best order (the top of this side of the book), or `None` if the side is
+    # empty.
+    def best(self) -> typing.Optional[Order]:
+        top = self.top_n(1)
+        return top[0] if len(top) > 0 else None
+
+    # Returns the side as price levels in lot space - a `dict` of price (in lots) to the total
+    # quantity (in lots) of all orders at that price, best price first. No `Decimal`s or `Order`s
+    # are created, so this is a cheap way to get the depth of the book.
+    def to_price_levels(self) -> typing.Dict[int, int]:
+        leaves = self.nodes[self._leaf_indices()]
+        levels: typing.Dict[int, int] = {}
+        for price_lots, quantity_lots in zip(leaves["price"].tolist(), leaves["quantity"].tolist()):
+            levels[price_lots] = levels.get(price_lots, 0) + quantity_lots
+        return levels
+
+    # Building the string means converting every order, and it can be logged a lot, so it's only
+    # rebuilt if the side has changed since last time.
     def __str__(self) -> str:
+        key = (self.address, self.leaf_count, self.bump_index)
+        cached = self._str_cache
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        text = self._build_str()
+        self._str_cache = (key, text)
+        return text
+
+    def _build_str(self) -> str:
         nodes = "\n        ".join([str(node).replace("\n", "\n        ") for node in self.orders()])
         return f"""« PerpOrderBookSide {self.version} [{self.address}]
     {self.meta_data}
@@ -116,6 +116,10 @@ class PerpMarket(LoadedMarket):
         side: PerpOrderBookSide = PerpOrderBookSide.parse(account_info, self.underlying_perp_market)
         return side.orders()
 
+    def parse_account_info_to_top_orders(self, account_info: AccountInfo, count: int) -> typing.Sequence[Order]:
+        side: PerpOrderBookSide = PerpOrderBookSide.parse(account_info, self.underlying_perp_market)
+        return side.top_n(count)
+
     def fetch_funding(self, context: Context) -> FundingRate:
         stats = context.fetch_stats(f"perp/funding_rate?mangoGroup={self.group.name}&market={self.symbol}")
         newest_stats = stats[0]
@@ -13,6 +13,7 @@
 #   [Github](https://github.com/blockworks-foundation)
 #   [Email](mailto:hello@blockworks.foundation)
 
+import functools
 import typing
 
 from datetime import datetime, timedelta, timezone
@@ -181,6 +182,12 @@ class PerpMarketDetails(AddressableAccount):
             raise Exception(f"PerpMarketDetails account not found at address '{address}'")
         return PerpMarketDetails.parse(account_info, group)
 
+    # The lot sizes and decimals never change for a market, so the `PerpScaler` that converts
+    # from lots is only built once.
+    @functools.cached_property
+    def scaler(self) -> "PerpScaler":
+        return PerpScaler.from_perp_market_details(self)
+
     def __str__(self) -> str:
         liquidity_mining_info: str = f"{self.liquidity_mining_info}".replace("\n", "\n        ")
         return f"""« PerpMarketDetails {self.version} [{self.address}]
@@ -200,3 +207,36 @@ class PerpMarketDetails(AddressableAccount):
     MNGO Vault: {self.mngo_vault}
         {liquidity_mining_info}
 »"""
+
+
+# # 🥭 PerpScaler class
+#
+# `PerpScaler` converts raw lot values from a perp market's orderbook into UI prices and
+# quantities. Everything it needs depends only on the market, so it can be worked out once and
+# then shared by every order on the book.
+#
+class PerpScaler(typing.NamedTuple):
+    price_multiplier: Decimal
+    base_lot_size: Decimal
+    base_factor: Decimal
+
+    @staticmethod
+    def from_perp_market_details(perp_market_details: PerpMarketDetails) -> "PerpScaler":
+        base_decimals = perp_market_details.base_instrument.decimals
+        quote_decimals = perp_market_details.quote_token.token.decimals
+        native_to_ui = Decimal(10) ** (base_decimals - quote_decimals)
+        price_multiplier = (perp_market_details.quote_lot_size / perp_market_details.base_lot_size) * native_to_ui
+        base_factor = Decimal(10) ** base_decimals
+        return PerpScaler(price_multiplier, perp_market_details.base_lot_size, base_factor)
+
+    def price(self, price_lots: int) -> Decimal:
+        return price_lots * self.price_multiplier
+
+    def quantity(self, quantity_lots: int) -> Decimal:
+        return (quantity_lots * self.base_lot_size) / self.base_factor
+
+    def __str__(self) -> str:
+        return f"« PerpScaler [price multiplier: {self.price_multiplier}, base lot size: {self.base_lot_size}, base factor: {self.base_factor}] »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
@@ -14,6 +14,7 @@
 #   [Email](mailto:hello@blockworks.foundation)
 
 import logging
+import threading
 import typing
 
 from decimal import Decimal
@@ -34,10 +35,11 @@ from .loadedmarket import LoadedMarket
 from .market import Market, InventorySource
 from .observables import DisposePropagator, LatestItemObserverSubscriber
 from .openorders import OpenOrders
+from .oracle import Oracle
 from .oracle import Price
 from .oracle import OracleProvider
 from .oraclefactory import create_oracle_provider
-from .orders import OrderBook
+from .orders import Order, OrderBook
 from .perpmarket import PerpMarket
 from .placedorder import PlacedOrdersContainer
 from .serummarket import SerumMarket
@@ -50,6 +52,13 @@ from .watcher import Watcher, LamdaUpdateWatcher
 from .websocketsubscription import WebSocketAccountSubscription, WebSocketSubscription, WebSocketSubscriptionManager
 
 
+# # 🥭 Watcher builders
+#
+# All the `build_*_watcher()` functions take the same leading `context`, `manager` and `health_check`
+# parameters, even the few that don't use them all, so they can all be called the same way.
+#
+
+
 def build_group_watcher(context: Context, manager: WebSocketSubscriptionManager, health_check: HealthCheck, group: Group) -> Watcher[Group]:
     group_subscription = WebSocketAccountSubscription[Group](
         context, group.address, lambda account_info: Group.parse(account_info, group.name, context.instrument_lookup, context.market_lookup))
@@ -135,6 +144,8 @@ def build_serum_open_orders_watcher(context: Context, manager: WebSocketSubscrip
     return latest_serum_open_orders_observer
 
 
+# Perp open orders are part of the `Account`, so this watches the existing account subscription
+# rather than adding a subscription of its own - `manager` isn't used.
 def build_perp_open_orders_watcher(context: Context, manager: WebSocketSubscriptionManager, health_check: HealthCheck, perp_market: PerpMarket, account: Account, group: Group, account_subscription: WebSocketSubscription[Account]) -> Watcher[PlacedOrdersContainer]:
     slot: GroupSlot = group.slot_by_perp_market_address(perp_market.address)
     index: int = slot.index
@@ -149,9 +160,54 @@ def build_perp_open_orders_watcher(context: Context, manager: WebSocketSubscript
     return latest_open_orders_observer
 
 
+# Oracle providers and oracles can be expensive to create (the Pyth provider fetches all its products
+# for every `oracle_for_market()` call) so they're shared between price watchers. `Context` isn't
+# hashable so they're keyed on the context's `id()`. The context is kept alongside its provider so
+# that `id()` can't be reused by a different context while the provider is cached.
+#
+# The lock only guards the dictionaries - providers and oracles are created outside it, so one slow
+# fetch doesn't hold up every other price watcher. If two threads race to create the same one, one
+# is just thrown away.
+#
+# Cached entries (and their contexts) live until `_clear_oracle_cache()` is called.
+_oracle_cache_lock: threading.Lock = threading.Lock()
+_oracle_providers: typing.Dict[typing.Tuple[int, str], typing.Tuple[Context, OracleProvider]] = {}
+_oracles: typing.Dict[typing.Tuple[int, str, str], Oracle] = {}
+
+
+def _cached_oracle_for_market(context: Context, provider_name: str, market: Market) -> typing.Optional[Oracle]:
+    provider_key: typing.Tuple[int, str] = (id(context), provider_name.upper())
+    oracle_key: typing.Tuple[int, str, str] = (*provider_key, str(market.address))
+    with _oracle_cache_lock:
+        cached_oracle: typing.Optional[Oracle] = _oracles.get(oracle_key)
+        cached_provider: typing.Optional[typing.Tuple[Context, OracleProvider]] = _oracle_providers.get(provider_key)
+    if cached_oracle is not None:
+        return cached_oracle
+
+    if cached_provider is None:
+        created_provider: OracleProvider = create_oracle_provider(context, provider_name)
+        with _oracle_cache_lock:
+            cached_provider = _oracle_providers.setdefault(provider_key, (context, created_provider))
+    _, oracle_provider = cached_provider
+
+    oracle: typing.Optional[Oracle] = oracle_provider.oracle_for_market(context, market)
+    if oracle is None:
+        return None
+
+    with _oracle_cache_lock:
+        return _oracles.setdefault(oracle_key, oracle)
+
+
+def _clear_oracle_cache() -> None:
+    with _oracle_cache_lock:
+        _oracle_providers.clear()
+        _oracles.clear()
+
+
+# Prices come from the oracle's own streaming observable, not a websocket account subscription, so
+# `manager` isn't used.
 def build_price_watcher(context: Context, manager: WebSocketSubscriptionManager, health_check: HealthCheck, disposer: DisposePropagator, provider_name: str, market: Market) -> LatestItemObserverSubscriber[Price]:
-    oracle_provider: OracleProvider = create_oracle_provider(context, provider_name)
-    oracle = oracle_provider.oracle_for_market(context, market)
+    oracle = _cached_oracle_for_market(context, provider_name, market)
     if oracle is None:
         raise Exception(f"Could not find oracle for market {market.symbol} from provider {provider_name}.")
 
@@ -206,7 +262,9 @@ def build_serum_inventory_watcher(context: Context, manager: WebSocketSubscripti
     return LamdaUpdateWatcher(serum_inventory_accessor)
 
 
-def build_orderbook_watcher(context: Context, manager: WebSocketSubscriptionManager, health_check: HealthCheck, market: LoadedMarket) -> Watcher[OrderBook]:
+# If `depth` is specified, only that many of the best orders on each side of the book are kept. This
+# can be a lot cheaper for markets that don't need to parse the whole book to find the best orders.
+def build_orderbook_watcher(context: Context, manager: WebSocketSubscriptionManager, health_check: HealthCheck, market: LoadedMarket, depth: typing.Optional[int] = None) -> Watcher[OrderBook]:
     orderbook_addresses: typing.List[PublicKey] = [
         market.bids_address,
         market.asks_address
@@ -215,17 +273,23 @@ def build_orderbook_watcher(context: Context, manager: WebSocketSubscriptionMana
     if len(orderbook_infos) != 2 or orderbook_infos[0] is None or orderbook_infos[1] is None:
         raise Exception(f"Could not find {market.symbol} order book at addresses {orderbook_addresses}.")
 
-    initial_orderbook: OrderBook = market.parse_account_infos_to_orderbook(orderbook_infos[0], orderbook_infos[1])
-    updatable_orderbook: OrderBook = market.parse_account_infos_to_orderbook(
-        orderbook_infos[0], orderbook_infos[1])
+    def _parse_orders(account_info: AccountInfo) -> typing.Sequence[Order]:
+        if depth is None:
+            return market.parse_account_info_to_orders(account_info)
+        return market.parse_account_info_to_top_orders(account_info, depth)
+
+    initial_orderbook: OrderBook = OrderBook(market.symbol, market.lot_size_converter,
+                                             _parse_orders(orderbook_infos[0]), _parse_orders(orderbook_infos[1]))
+    updatable_orderbook: OrderBook = OrderBook(market.symbol, market.lot_size_converter,
+                                               _parse_orders(orderbook_infos[0]), _parse_orders(orderbook_infos[1]))
 
     def _update_bids(account_info: AccountInfo) -> OrderBook:
-        new_bids = market.parse_account_info_to_orders(account_info)
+        new_bids = _parse_orders(account_info)
         updatable_orderbook.bids = new_bids
         return updatable_orderbook
 
     def _update_asks(account_info: AccountInfo) -> OrderBook:
-        new_asks = market.parse_account_info_to_orders(account_info)
+        new_asks = _parse_orders(account_info)
         updatable_orderbook.asks = new_asks
         return updatable_orderbook
     bids_subscription = WebSocketAccountSubscription[OrderBook](context, orderbook_addresses[0], _update_bids)
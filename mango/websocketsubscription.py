@@ -18,9 +18,13 @@ import logging
 import typing
 import websocket
 
+import rx.operators as ops
+
 from datetime import datetime
 from rx.subject.behaviorsubject import BehaviorSubject
+from rx.subject.subject import Subject
 from rx.core.typing import Disposable
+from rx.scheduler.threadpoolscheduler import ThreadPoolScheduler
 from solana.publickey import PublicKey
 from solana.rpc.types import RPCResponse
 
@@ -248,12 +252,44 @@ class IndividualWebSocketSubscriptionManager(WebSocketSubscriptionManager):
 # The `SharedWebSocketSubscriptionManager` runs a single websocket and sends updates to the correct
 # `WebSocketSubscription`.
 #
+# Since every update arrives on the one websocket thread, updates aren't parsed there. Each
+# subscription's updates are instead handed to a thread pool, with `observe_on()` making sure each
+# subscription still sees its own updates one at a time and in order. That lets updates for
+# different subscriptions be parsed at the same time - but only for callers that put several
+# subscriptions on one shared manager. (At the moment that's only `watch-minimum-balances`, and
+# the marketmaker uses `IndividualWebSocketSubscriptionManager`, which runs each subscription on
+# its own websocket thread anyway.)
+#
 class SharedWebSocketSubscriptionManager(WebSocketSubscriptionManager):
     def __init__(self, context: Context, ping_interval: int = 10) -> None:
         super().__init__(context, ping_interval)
         self.ws: typing.Optional[ReconnectingWebsocket] = None
         self.pong: BehaviorSubject = BehaviorSubject(datetime.now())
         self._pong_subscription: typing.Optional[Disposable] = None
+        self._scheduler: ThreadPoolScheduler = context.create_thread_pool_scheduler()
+        self._updates: typing.Dict[int, Subject] = {}
+        self._update_subscriptions: typing.List[Disposable] = []
+
+    def add(self, subscription: WebSocketSubscription[typing.Any]) -> None:
+        super().add(subscription)
+        updates: Subject = Subject()
+        update_subscription: Disposable = updates.pipe(
+            ops.observe_on(self._scheduler)
+        ).subscribe(on_next=lambda params: self._build_and_publish(subscription, params))
+        self._updates[subscription.id] = updates
+        self._update_subscriptions += [update_subscription]
+
+    def _build_and_publish(self, subscription: WebSocketSubscription[typing.Any], params: RPCResponse) -> None:
+        # An update can still be queued on the pool when the subscription is disposed.
+        if subscription.publisher.is_disposed:
+            return
+
+        try:
+            built = subscription.build_subscribed_instance(params)
+        except Exception as exception:
+            self._logger.error(f"[{self.context.name}] Could not build update for {subscription.address}: {exception}")
+            return
+        subscription.publisher.publish(built)
 
     def open(self) -> None:
         websocket_url = self.context.client.cluster_url.replace("https", "wss", 1)
@@ -295,8 +331,10 @@ class SharedWebSocketSubscriptionManager(WebSocketSubscriptionManager):
         elif (response["method"] == "accountNotification") or (response["method"] == "programNotification") or (response["method"] == "logsNotification"):
             subscription_id = response["params"]["subscription"]
             subscription = self.subscription_by_subscription_id(subscription_id)
-            built = subscription.build_subscribed_instance(response["params"])
-            subscription.publisher.publish(built)
+            # There are no updates to send to once the manager has been disposed.
+            updates: typing.Optional[Subject] = self._updates.get(subscription.id)
+            if updates is not None:
+                updates.on_next(response["params"])
         else:
             self._logger.error(f"[{self.context.name}] Unknown response: {response}")
 
@@ -305,6 +343,12 @@ class SharedWebSocketSubscriptionManager(WebSocketSubscriptionManager):
             ws.send(subscription.build_request())
 
     def dispose(self) -> None:
+        for updates in self._updates.values():
+            updates.on_completed()
+        self._updates = {}
+        for update_subscription in self._update_subscriptions:
+            update_subscription.dispose()
+        self._update_subscriptions = []
         super().dispose()
         if self.ws is not None:
             if self._pong_subscription is not None:
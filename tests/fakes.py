@@ -6,6 +6,7 @@ import typing
 
 from decimal import Decimal
 from mango.lotsizeconverter import NullLotSizeConverter
+from mango.perpmarketdetails import LiquidityMiningInfo
 from pyserum.market.market import Market as PySerumMarket
 from pyserum.market.state import MarketState as PySerumMarketState
 from solana.keypair import Keypair
@@ -14,6 +15,8 @@ from solana.rpc.api import Client
 from solana.rpc.commitment import Commitment
 from solana.rpc.types import RPCResponse
 
+from .data import load_group
+
 
 class MockCompatibleClient(Client):
     def __init__(self) -> None:
@@ -35,6 +38,32 @@ class MockClient(mango.BetterClient):
                          False, "base64", 0, compound)
 
 
+# A market whose bids and asks are fixed lists of orders, served from fake bids and asks accounts.
+class MockOrderBookMarket(mango.LoadedMarket):
+    def __init__(self, bids: typing.Sequence[mango.Order], asks: typing.Sequence[mango.Order]) -> None:
+        base = fake_token("BASE")
+        quote = fake_token("QUOTE")
+        super().__init__(fake_seeded_public_key("program ID"), fake_seeded_public_key("orderbook market"),
+                         mango.InventorySource.ACCOUNT, base, quote, mango.LotSizeConverter(base, Decimal(1), quote, Decimal(1)))
+        self.bids: typing.Sequence[mango.Order] = bids
+        self.asks: typing.Sequence[mango.Order] = asks
+
+    @property
+    def bids_address(self) -> PublicKey:
+        return fake_seeded_public_key("bids")
+
+    @property
+    def asks_address(self) -> PublicKey:
+        return fake_seeded_public_key("asks")
+
+    def parse_account_info_to_orders(self, account_info: mango.AccountInfo) -> typing.Sequence[mango.Order]:
+        return self.bids if account_info.address == self.bids_address else self.asks
+
+
+def fake_orders(side: mango.Side, ids: typing.Sequence[int]) -> typing.Sequence[mango.Order]:
+    return [fake_order(price=Decimal(id), side=side).with_id(id) for id in ids]
+
+
 def fake_public_key() -> PublicKey:
     return PublicKey("11111111111111111111111111111112")
 
@@ -113,6 +142,32 @@ def fake_loaded_market(base_lot_size: Decimal = Decimal(1), quote_lot_size: Deci
     return mango.LoadedMarket(fake_seeded_public_key("program ID"), fake_seeded_public_key("perp market"), mango.InventorySource.ACCOUNT, base, quote, mango.LotSizeConverter(base, base_lot_size, quote, quote_lot_size))
 
 
+def fake_perp_market_details() -> mango.PerpMarketDetails:
+    group = load_group("tests/testdata/account1/group.json")
+    # Slot 3 is SOL-PERP, which has 9 base decimals and 6 quote decimals.
+    slot = group.slots_by_index[3]
+    assert slot is not None and slot.perp_market is not None
+    account_info = fake_account_info(slot.perp_market.address)
+    meta_data = mango.Metadata(mango.layouts.DATA_TYPE.PerpMarket, mango.Version.V1, True)
+    # Half the period's MNGO has been handed out, so the details can be printed.
+    liquidity_mining_info = LiquidityMiningInfo(mango.Version.V1, Decimal(0), Decimal(0),
+                                                datetime.datetime.now(datetime.timezone.utc),
+                                                datetime.timedelta(seconds=1), fake_instrument_value(Decimal(50)),
+                                                fake_instrument_value(Decimal(100)))
+    return mango.PerpMarketDetails(account_info, mango.Version.V1, meta_data, group, fake_seeded_public_key("bids"),
+                                   fake_seeded_public_key("asks"), fake_seeded_public_key("event queue"),
+                                   Decimal(10000000), Decimal(100), Decimal(0), Decimal(0), Decimal(0),
+                                   datetime.datetime.now(datetime.timezone.utc), Decimal(0), Decimal(0), liquidity_mining_info,
+                                   fake_seeded_public_key("mngo vault"))
+
+
+def fake_perp_market() -> mango.PerpMarket:
+    perp_market_details = fake_perp_market_details()
+    return mango.PerpMarket(fake_seeded_public_key("program ID"), perp_market_details.address,
+                            perp_market_details.base_instrument, perp_market_details.quote_token.token,
+                            perp_market_details)
+
+
 def fake_token_account() -> mango.TokenAccount:
     token_account_info = fake_account_info()
     token = fake_token()
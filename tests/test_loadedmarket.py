@@ -0,0 +1,20 @@
+from .context import mango
+from .fakes import fake_account_info, fake_orders, MockOrderBookMarket
+
+
+def test_parse_account_info_to_top_orders_matches_orderbook() -> None:
+    bids = fake_orders(mango.Side.BUY, [5, 30, 10, 25, 1])
+    asks = fake_orders(mango.Side.SELL, [40, 35, 60, 36, 50])
+    market = MockOrderBookMarket(bids, asks)
+    bids_account_info = fake_account_info(market.bids_address)
+    asks_account_info = fake_account_info(market.asks_address)
+    orderbook = mango.OrderBook(market.symbol, market.lot_size_converter, bids, asks)
+
+    for count in [0, 1, 3, 10]:
+        assert list(market.parse_account_info_to_top_orders(bids_account_info, count)) == list(orderbook.bids[:count])
+        assert list(market.parse_account_info_to_top_orders(asks_account_info, count)) == list(orderbook.asks[:count])
+
+
+def test_parse_account_info_to_top_orders_empty() -> None:
+    market = MockOrderBookMarket([], [])
+    assert list(market.parse_account_info_to_top_orders(fake_account_info(market.bids_address), 5)) == []
@@ -0,0 +1,188 @@
+import pytest
+import struct
+import typing
+
+from .context import mango
+from .fakes import fake_account_info, fake_perp_market_details, fake_seeded_public_key
+
+from decimal import Decimal
+
+
+# Builds the raw account data for an orderbook side holding the given (price, sequence number, quantity)
+# orders. Inner nodes split the (sorted) keys in half, so children[0] always holds the lower keys.
+def _fake_orderbook_side_data(orders: typing.Sequence[typing.Tuple[int, int, int]], is_bids: bool) -> bytes:
+    node_size = mango.layouts.ANY_NODE.sizeof()
+    nodes: typing.List[bytes] = []
+
+    def _add(keyed: typing.Sequence[typing.Tuple[int, int, int, int]]) -> int:
+        index = len(nodes)
+        nodes.append(bytes(node_size))
+        if len(keyed) == 1:
+            key, price, sequence_number, quantity = keyed[0]
+            owner = bytes(fake_seeded_public_key(f"owner {sequence_number}"))
+            nodes[index] = struct.pack("<IB3x", 2, 0) + key.to_bytes(16, "little") + owner + \
+                struct.pack("<QQqQ", quantity, sequence_number + 1000, 0, 0)
+        else:
+            middle = len(keyed) // 2
+            lower = _add(keyed[:middle])
+            upper = _add(keyed[middle:])
+            nodes[index] = struct.pack("<II", 1, 0) + keyed[middle][0].to_bytes(16, "little") + \
+                struct.pack("<II", lower, upper) + bytes(node_size - 32)
+        return index
+
+    keyed = sorted([((price << 64) | sequence_number, price, sequence_number, quantity)
+                    for price, sequence_number, quantity in orders])
+    root = _add(keyed) if len(keyed) > 0 else 0
+    nodes += [bytes(node_size)] * (mango.layouts.MAX_BOOK_NODES - len(nodes))
+
+    meta_data = struct.pack("<BBB5x", 5 if is_bids else 6, 0, 1)
+    header = struct.pack("<QQIIQ", len(keyed), 0, 0, root, len(keyed))
+    return meta_data + header + b"".join(nodes)
+
+
+def _fake_orderbook_side(orders: typing.Sequence[typing.Tuple[int, int, int]], is_bids: bool) -> mango.PerpOrderBookSide:
+    data = _fake_orderbook_side_data(orders, is_bids)
+    account_info = fake_account_info(fake_seeded_public_key("orderbook side"), data=data)
+    return mango.PerpOrderBookSide.parse(account_info, fake_perp_market_details())
+
+
+def test_parse_matches_layout() -> None:
+    data = _fake_orderbook_side_data([(20, 1, 5), (10, 2, 7), (30, 3, 9)], True)
+    account_info = fake_account_info(fake_seeded_public_key("orderbook side"), data=data)
+    actual = mango.PerpOrderBookSide.parse(account_info, fake_perp_market_details())
+    layout = mango.layouts.ORDERBOOK_SIDE.parse(data)
+
+    assert actual.meta_data.data_type == layout.meta_data.data_type
+    assert actual.bump_index == layout.bump_index
+    assert actual.free_list_len == layout.free_list_len
+    assert actual.free_list_head == layout.free_list_head
+    assert actual.root_node == layout.root_node
+    assert actual.leaf_count == layout.leaf_count
+
+    leaves = [node for node in layout.nodes if node.type_name == "leaf"]
+    expected = sorted([(leaf.key["order_id"], leaf.client_order_id, leaf.owner) for leaf in leaves], reverse=True)
+    assert [(order.id, order.client_id, order.owner) for order in actual.orders()] == expected
+
+
+def test_parse_rejects_wrong_size() -> None:
+    account_info = fake_account_info(fake_seeded_public_key("orderbook side"), data=bytes(100))
+    with pytest.raises(Exception, match="does not match expected size"):
+        mango.PerpOrderBookSide.parse(account_info, fake_perp_market_details())
+
+
+def test_empty_orders() -> None:
+    actual = _fake_orderbook_side([], True)
+    assert actual.leaf_count == 0
+    assert list(actual.orders()) == []
+
+
+def test_bids_best_first() -> None:
+    actual = _fake_orderbook_side([(20, 1, 5), (10, 2, 7), (30, 3, 9)], True)
+    orders = actual.orders()
+    assert [order.side for order in orders] == [mango.Side.BUY] * 3
+    # SOL-PERP: price multiplier is (100 / 10000000) * 10^3, quantity multiplier is 10000000 / 10^9
+    assert [order.price for order in orders] == [Decimal("0.3"), Decimal("0.2"), Decimal("0.1")]
+    assert [order.quantity for order in orders] == [Decimal("0.09"), Decimal("0.05"), Decimal("0.07")]
+    assert [order.id for order in orders] == [(30 << 64) | 3, (20 << 64) | 1, (10 << 64) | 2]
+    assert [order.client_id for order in orders] == [1003, 1001, 1002]
+    assert orders[0].owner == fake_seeded_public_key("owner 3")
+
+
+def test_asks_best_first() -> None:
+    actual = _fake_orderbook_side([(20, 1, 5), (10, 2, 7), (30, 3, 9)], False)
+    orders = actual.orders()
+    assert [order.side for order in orders] == [mango.Side.SELL] * 3
+    assert [order.price for order in orders] == [Decimal("0.1"), Decimal("0.2"), Decimal("0.3")]
+
+
+def test_top_n_bids() -> None:
+    actual = _fake_orderbook_side([(20, 1, 5), (10, 2, 7), (30, 3, 9), (25, 4, 1), (15, 5, 2)], True)
+    top = actual.top_n(2)
+    assert [order.price for order in top] == [Decimal("0.3"), Decimal("0.25")]
+    assert list(actual.top_n(10)) == list(actual.orders())
+    assert list(actual.top_n(0)) == []
+
+
+def test_top_n_asks() -> None:
+    actual = _fake_orderbook_side([(20, 1, 5), (10, 2, 7), (30, 3, 9), (25, 4, 1), (15, 5, 2)], False)
+    top = actual.top_n(3)
+    assert [order.price for order in top] == [Decimal("0.1"), Decimal("0.15"), Decimal("0.2")]
+
+
+def test_best() -> None:
+    bids = _fake_orderbook_side([(20, 1, 5), (10, 2, 7), (30, 3, 9)], True)
+    asks = _fake_orderbook_side([(20, 1, 5), (10, 2, 7), (30, 3, 9)], False)
+    empty = _fake_orderbook_side([], True)
+    assert bids.best() == bids.orders()[0]
+    assert asks.best() == asks.orders()[0]
+    assert empty.best() is None
+
+
+def test_to_price_levels() -> None:
+    actual = _fake_orderbook_side([(20, 1, 5), (10, 2, 7), (30, 3, 9), (20, 4, 1), (10, 5, 2)], True)
+    levels = actual.to_price_levels()
+    assert levels == {30: 9, 20: 6, 10: 9}
+    assert list(levels.keys()) == [30, 20, 10]
+
+
+def test_repeated_walks_match() -> None:
+    actual = _fake_orderbook_side([(20, 1, 5), (10, 2, 7), (30, 3, 9), (25, 4, 1), (15, 5, 2)], True)
+    everything = list(actual.orders())
+    # A limited walk leaves nodes on the stack, which mustn't leak into the next walk.
+    assert [order.id for order in actual.top_n(1)] == [everything[0].id]
+    assert list(actual.orders()) == everything
+    assert list(actual.top_n(2)) == everything[:2]
+
+
+def test_orders_iter_matches_orders() -> None:
+    actual = _fake_orderbook_side([(20, 1, 5), (10, 2, 7), (30, 3, 9)], False)
+    assert isinstance(actual.orders(), list)
+    assert list(actual._orders_iter()) == actual.orders()
+
+
+def test_layout_order_id_is_int() -> None:
+    data = _fake_orderbook_side_data([(20, 1, 5)], True)
+    layout = mango.layouts.ORDERBOOK_SIDE.parse(data)
+    leaf = [node for node in layout.nodes if node.type_name == "leaf"][0]
+    assert isinstance(leaf.key["order_id"], int)
+    assert leaf.key["order_id"] == (20 << 64) | 1
+    assert leaf.key["price"] == Decimal(20)
+    assert leaf.key["sequence_number"] == Decimal(1)
+
+
+def test_perp_market_details_scaler_is_cached() -> None:
+    perp_market_details = fake_perp_market_details()
+    scaler = perp_market_details.scaler
+    assert scaler is perp_market_details.scaler
+    assert scaler == mango.PerpScaler.from_perp_market_details(perp_market_details)
+    assert scaler.price(30) == Decimal("0.3")
+    assert scaler.quantity(9) == Decimal("0.09")
+
+
+def test_full_walk_matches_tree_walk() -> None:
+    orders = [(20, 1, 5), (10, 2, 7), (30, 3, 9), (20, 4, 1), (10, 5, 2), (25, 6, 3)]
+    for is_bids in [True, False]:
+        actual = _fake_orderbook_side(orders, is_bids)
+        expected = actual._leaf_indices(len(orders))
+        assert actual._sorted_leaf_indices() == expected
+        assert actual._leaf_indices() == expected
+
+
+def test_full_walk_falls_back_to_tree_walk() -> None:
+    actual = _fake_orderbook_side([(20, 1, 5), (10, 2, 7), (30, 3, 9)], True)
+    expected = list(actual.orders())
+
+    # A leaf that isn't counted in the header means the data can't be trusted for sorting.
+    actual.leaf_count = Decimal(2)
+    assert actual._sorted_leaf_indices() is None
+    assert list(actual.orders()) == expected
+
+
+def test_str_is_cached_until_side_changes() -> None:
+    actual = _fake_orderbook_side([(20, 1, 5), (10, 2, 7), (30, 3, 9)], True)
+    text = str(actual)
+    assert "Leaf Count: 3" in text
+    assert str(actual) is text
+
+    actual.leaf_count = Decimal(4)
+    assert "Leaf Count: 4" in str(actual)
@@ -0,0 +1,78 @@
+from .context import mango
+from .fakes import fake_account_info, fake_context, fake_loaded_market, fake_orders, fake_perp_market, MockClient, MockOrderBookMarket
+
+import pathlib
+import typing
+
+from mango.watchers import _cached_oracle_for_market, _clear_oracle_cache, _oracle_providers, _oracles
+
+
+# Returns an empty account for every address asked for.
+class MockAccountsClient(MockClient):
+    def get_multiple_accounts(self, pubkeys: typing.List[typing.Any], *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        return [{"executable": False, "lamports": 0, "owner": "11111111111111111111111111111111",
+                 "rentEpoch": 0, "data": ["", "base64"]} for _ in pubkeys]
+
+
+def _build_orderbook_watcher(market: mango.LoadedMarket, depth: typing.Optional[int], healthcheck_location: pathlib.Path) -> typing.Tuple[mango.WebSocketSubscriptionManager, mango.Watcher[mango.OrderBook]]:
+    context = fake_context()
+    context.client = MockAccountsClient()
+    manager = mango.IndividualWebSocketSubscriptionManager(context)
+    health_check = mango.HealthCheck(str(healthcheck_location))
+    watcher = mango.build_orderbook_watcher(context, manager, health_check, market, depth)
+    return manager, watcher
+
+
+def test_orderbook_watcher_without_depth(tmp_path: pathlib.Path) -> None:
+    market = MockOrderBookMarket(fake_orders(mango.Side.BUY, [5, 30, 10]), fake_orders(mango.Side.SELL, [40, 35, 60]))
+    _, watcher = _build_orderbook_watcher(market, None, tmp_path)
+    assert [order.id for order in watcher.latest.bids] == [30, 10, 5]
+    assert [order.id for order in watcher.latest.asks] == [35, 40, 60]
+
+
+def test_orderbook_watcher_with_depth(tmp_path: pathlib.Path) -> None:
+    market = MockOrderBookMarket(fake_orders(mango.Side.BUY, [5, 30, 10]), fake_orders(mango.Side.SELL, [40, 35, 60]))
+    manager, watcher = _build_orderbook_watcher(market, 2, tmp_path)
+    assert [order.id for order in watcher.latest.bids] == [30, 10]
+    assert [order.id for order in watcher.latest.asks] == [35, 40]
+
+    # Updates are cut to the same depth.
+    market.bids = fake_orders(mango.Side.BUY, [7, 50, 20, 45])
+    bids_subscription = manager.subscriptions[0]
+    bids_subscription.publisher.publish(bids_subscription.from_account_info(fake_account_info(market.bids_address)))
+    assert [order.id for order in watcher.latest.bids] == [50, 45]
+    assert [order.id for order in watcher.latest.asks] == [35, 40]
+
+
+def test_cached_oracle_for_market_shares_provider_and_oracle() -> None:
+    _clear_oracle_cache()
+    context = fake_context()
+    market = fake_perp_market()
+
+    first: typing.Optional[mango.Oracle] = _cached_oracle_for_market(context, "stub", market)
+    provider = _oracle_providers[(id(context), "STUB")][1]
+    second: typing.Optional[mango.Oracle] = _cached_oracle_for_market(context, "STUB", market)
+
+    assert first is not None
+    assert second is first
+    assert _oracle_providers[(id(context), "STUB")][1] is provider
+    _clear_oracle_cache()
+
+
+def test_cached_oracle_for_market_does_not_cache_none() -> None:
+    _clear_oracle_cache()
+    context = fake_context()
+
+    # The stub provider only has oracles for spot and perp markets.
+    assert _cached_oracle_for_market(context, "stub", fake_loaded_market()) is None
+    assert len(_oracles) == 0
+    assert (id(context), "STUB") in _oracle_providers
+    _clear_oracle_cache()
+
+
+def test_clear_oracle_cache() -> None:
+    context = fake_context()
+    _cached_oracle_for_market(context, "stub", fake_perp_market())
+    _clear_oracle_cache()
+    assert len(_oracle_providers) == 0
+    assert len(_oracles) == 0
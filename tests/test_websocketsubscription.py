@@ -0,0 +1,97 @@
+from .context import mango
+from .fakes import fake_context, fake_seeded_public_key
+
+import logging
+import pytest
+import threading
+import time
+import typing
+
+from solana.rpc.types import RPCResponse
+
+
+class FakeWebSocketSubscription(mango.WebSocketSubscription[int]):
+    def __init__(self, context: mango.Context) -> None:
+        super().__init__(context, fake_seeded_public_key("subscription"), lambda account_info: 0)
+
+    def build_request(self) -> str:
+        return ""
+
+    def build_subscribed_instance(self, response: RPCResponse) -> int:
+        value: int = response["result"]
+        if value < 0:
+            raise Exception(f"Bad value {value}")
+        return value
+
+
+def _shared_manager_with_subscription(subscription_id: int = 77) -> typing.Tuple[mango.SharedWebSocketSubscriptionManager, FakeWebSocketSubscription]:
+    context = fake_context()
+    manager = mango.SharedWebSocketSubscriptionManager(context)
+    subscription = FakeWebSocketSubscription(context)
+    manager.add(subscription)
+    manager.on_item({"id": subscription.id, "result": subscription_id})
+    return manager, subscription
+
+
+def _notify(manager: mango.SharedWebSocketSubscriptionManager, value: int, subscription_id: int = 77) -> None:
+    manager.on_item({"method": "accountNotification", "params": {"subscription": subscription_id, "result": value}})
+
+
+def _wait_for(collected: typing.List[int], count: int) -> None:
+    deadline = time.time() + 5
+    while len(collected) < count and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_shared_manager_publishes_updates_in_order() -> None:
+    manager, subscription = _shared_manager_with_subscription()
+    collected = mango.CollectingObserverSubscriber()
+    subscription.publisher.subscribe(collected)
+
+    for value in range(100):
+        _notify(manager, value)
+
+    _wait_for(collected.collected, 100)
+    manager.dispose()
+    assert collected.collected == list(range(100))
+
+
+def test_shared_manager_logs_failed_builds_and_continues(caplog: pytest.LogCaptureFixture) -> None:
+    manager, subscription = _shared_manager_with_subscription()
+    collected = mango.CollectingObserverSubscriber()
+    subscription.publisher.subscribe(collected)
+
+    with caplog.at_level(logging.ERROR):
+        _notify(manager, 1)
+        _notify(manager, -1)
+        _notify(manager, 2)
+        _wait_for(collected.collected, 2)
+
+    manager.dispose()
+    assert collected.collected == [1, 2]
+    assert "Bad value -1" in caplog.text
+
+
+def test_shared_manager_dispose_completes_updates(caplog: pytest.LogCaptureFixture) -> None:
+    manager, subscription = _shared_manager_with_subscription()
+    updates = manager._updates[subscription.id]
+    completed = threading.Event()
+    updates.subscribe(on_completed=completed.set)
+
+    manager.dispose()
+    assert completed.is_set()
+    assert updates.is_stopped
+
+    # An update that was still queued when the manager was disposed is dropped quietly.
+    with caplog.at_level(logging.WARNING):
+        manager._build_and_publish(subscription, {"result": 3})
+    assert caplog.text == ""
+
+
+def test_shared_manager_drops_notifications_after_dispose(caplog: pytest.LogCaptureFixture) -> None:
+    manager, subscription = _shared_manager_with_subscription()
+    manager.dispose()
+
+    with caplog.at_level(logging.WARNING):
+        _notify(manager, 4)
+    assert caplog.text == ""